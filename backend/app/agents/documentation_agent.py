@@ -1,4 +1,8 @@
 """Documentation agent: summary, SOAP note, follow-up tasks. Conservative language."""
+from typing import Dict, Optional
+
+from app import tracing
+from app.agents.prompts import SHARED_SYSTEM, build_user_message
 from app.llm import call_llm_json
 from app.schemas import (
     DocumentationResult,
@@ -7,29 +11,45 @@ from app.schemas import (
     OrchestrationResult,
     TriageResult,
     IntentResult,
+    StageUsage,
 )
 
 
-SYSTEM = """You are a healthcare call documentation assistant. Create documentation from the call. Rules:
-- Be conservative: no medical diagnosis. Use "possible", "reported", "caller stated".
+# Transcript excerpt length for this stage (intent and triage get the full transcript).
+TRANSCRIPT_CHAR_LIMIT = 3000
+
+TASK = """Task (documentation): create documentation for the call.
 - Summary: 4-6 bullet points.
 - SOAP: S=Subjective (caller's report), O=Objective (if any from call), A=Assessment (possible/working assessment only), P=Plan (next steps). Keep aligned to urgency and route.
-- Follow-up tasks: 2-5 concrete tasks.
-Return only valid JSON matching the schema. No markdown, no extra keys."""
+- Follow-up tasks: 2-5 concrete tasks."""
 
 
+@tracing.traced("agent.documentation")
 def run_documentation(
     transcript: str,
     intent: IntentResult,
     triage: TriageResult,
     orchestration: OrchestrationResult,
     model: str,
+    usage: Optional[Dict[str, StageUsage]] = None,
+    repair_model: Optional[str] = None,
 ) -> DocumentationResult:
-    user = (
-        f"Intent: {intent.intent}. Urgency: {triage.urgency}. Route: {orchestration.route_to}.\n\n"
-        f"Transcript:\n{transcript[:3000]}"
+    user = build_user_message(
+        transcript,
+        TASK,
+        facts=f"Intent: {intent.intent}. Urgency: {triage.urgency}. Route: {orchestration.route_to}.",
+        char_limit=TRANSCRIPT_CHAR_LIMIT,
+    )
+    raw = call_llm_json(
+        model,
+        SHARED_SYSTEM,
+        user,
+        DOCUMENTATION_JSON_SCHEMA,
+        stage="documentation",
+        usage=usage,
+        repair_model=repair_model,
     )
-    raw = call_llm_json(model, SYSTEM, user, DOCUMENTATION_JSON_SCHEMA)
     soap = raw["soap"]
     raw["soap"] = SOAPNote(S=soap["S"], O=soap["O"], A=soap["A"], P=soap["P"])
-    return DocumentationResult(**raw)
+    with tracing.span("validate", schema="DocumentationResult"):
+        return DocumentationResult(**raw)
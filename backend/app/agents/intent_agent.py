@@ -1,15 +1,30 @@
 """Intent classification agent using LLM with structured output."""
+from typing import Dict, Optional
+
+from app import tracing
+from app.agents.prompts import SHARED_SYSTEM, build_user_message
 from app.llm import call_llm_json
-from app.schemas import IntentResult, INTENT_JSON_SCHEMA
+from app.schemas import IntentResult, INTENT_JSON_SCHEMA, StageUsage
 
-SYSTEM = """You are a healthcare call center intent classifier. Given a call transcript, classify the primary intent into exactly one of: scheduling, billing, refill, symptoms.
-- scheduling: appointment booking, rescheduling, cancellation, availability
-- billing: charges, insurance, payment, statements
-- refill: prescription refill, medication renewal
-- symptoms: patient describing symptoms, seeking medical advice, feeling unwell
-Return only valid JSON matching the schema. No markdown, no extra keys."""
+TASK = """Task (intent classification): classify the primary intent of the call into exactly one of: scheduling, billing, refill, symptoms. Give a confidence between 0 and 1 and a one-sentence reason."""
 
 
-def run_intent(transcript: str, model: str) -> IntentResult:
-    raw = call_llm_json(model, SYSTEM, transcript, INTENT_JSON_SCHEMA)
-    return IntentResult(**raw)
+@tracing.traced("agent.intent")
+def run_intent(
+    transcript: str,
+    model: str,
+    usage: Optional[Dict[str, StageUsage]] = None,
+    repair_model: Optional[str] = None,
+) -> IntentResult:
+    user = build_user_message(transcript, TASK)
+    raw = call_llm_json(
+        model,
+        SHARED_SYSTEM,
+        user,
+        INTENT_JSON_SCHEMA,
+        stage="intent",
+        usage=usage,
+        repair_model=repair_model,
+    )
+    with tracing.span("validate", schema="IntentResult"):
+        return IntentResult(**raw)
@@ -1,9 +1,13 @@
 """Orchestrator: deterministic routing + LLM for next_best_actions and suggested_script."""
+from typing import Dict, Optional
+
+from app import tracing
+from app.agents.prompts import SHARED_SYSTEM, build_user_message
 from app.llm import call_llm_json
-from app.schemas import IntentResult, TriageResult, OrchestrationResult, ORCHESTRATION_JSON_SCHEMA
+from app.schemas import IntentResult, TriageResult, OrchestrationResult, ORCHESTRATION_JSON_SCHEMA, StageUsage
 
 
-def _route(intent: IntentResult, triage: TriageResult) -> str:
+def decide_route(intent: IntentResult, triage: TriageResult) -> str:
     if intent.intent != "symptoms":
         return "agent"
     if triage.urgency == "er":
@@ -17,25 +21,41 @@ def _route(intent: IntentResult, triage: TriageResult) -> str:
     return "agent"
 
 
-SYSTEM = """You are a healthcare call center orchestrator. Given intent, triage urgency, and route_to, produce:
+# Transcript excerpt length for this stage (intent and triage get the full transcript).
+TRANSCRIPT_CHAR_LIMIT = 1500
+
+TASK = """Task (orchestration): given the intent, urgency and route in the known facts, produce:
 - next_best_actions: 4-8 concrete actions the agent should take (e.g., verify insurance, schedule callback).
 - suggested_script: 3-6 lines the agent can say to the caller, appropriate for the route and intent.
-- escalation_reason: null unless escalating; otherwise short reason.
-Return only valid JSON matching the schema. No markdown, no extra keys."""
+- escalation_reason: null unless escalating; otherwise short reason."""
 
 
+@tracing.traced("agent.orchestration")
 def run_orchestrator(
     transcript: str,
     intent: IntentResult,
     triage: TriageResult,
     model: str,
+    usage: Optional[Dict[str, StageUsage]] = None,
+    repair_model: Optional[str] = None,
 ) -> OrchestrationResult:
-    route_to = _route(intent, triage)
-    user = (
-        f"Intent: {intent.intent}. Urgency: {triage.urgency}. Route: {route_to}.\n\n"
-        f"Transcript (excerpt): {transcript[:1500]}"
+    route_to = decide_route(intent, triage)
+    user = build_user_message(
+        transcript,
+        TASK,
+        facts=f"Intent: {intent.intent}. Urgency: {triage.urgency}. Route: {route_to}.",
+        char_limit=TRANSCRIPT_CHAR_LIMIT,
+    )
+    raw = call_llm_json(
+        model,
+        SHARED_SYSTEM,
+        user,
+        ORCHESTRATION_JSON_SCHEMA,
+        stage="orchestration",
+        usage=usage,
+        repair_model=repair_model,
     )
-    raw = call_llm_json(model, SYSTEM, user, ORCHESTRATION_JSON_SCHEMA)
     # Enforce deterministic route
     raw["route_to"] = route_to
-    return OrchestrationResult(**raw)
+    with tracing.span("validate", schema="OrchestrationResult"):
+        return OrchestrationResult(**raw)
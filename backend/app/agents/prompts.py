@@ -0,0 +1,48 @@
+"""
+Prompt layout shared by all agents: one system prompt, then the transcript, then stage facts and task.
+
+Keeping SHARED_SYSTEM and the transcript block byte-identical lets the provider's prefix cache
+serve a repeat of the same stage (the repair retry, or re-analysis of the same call) once the
+prefix passes the 1024-token caching minimum. Stages do not share cache entries with each other:
+the per-stage response schema precedes the messages in the cache key. SHARED_SYSTEM is about
+375 tokens, so short transcripts are not cached at all.
+Keep anything request- or stage-specific out of SHARED_SYSTEM and after the transcript.
+
+Intent and triage see the full transcript; orchestration and documentation get shorter excerpts
+(input cost on long calls).
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+SHARED_SYSTEM = """You are part of a healthcare call center agent-assist pipeline. A single call transcript is analyzed in four stages, each a separate request with its own task section at the end of the user message: intent classification, triage, orchestration, and documentation.
+
+General rules for every stage:
+- You assist a human call center agent. You do not diagnose. Use conservative language such as "possible", "reported", "caller stated".
+- Base every answer on the transcript and on the facts given in the task section. Do not invent details that are not in the call.
+- When safety is in doubt, prefer the more cautious option.
+- Be concise and concrete. Write for a busy agent who reads your output while on the call.
+
+Reference definitions used across stages:
+- Intents: scheduling (appointment booking, rescheduling, cancellation, availability); billing (charges, insurance, payment, statements); refill (prescription refill, medication renewal); symptoms (patient describing symptoms, seeking medical advice, feeling unwell).
+- Urgency levels: er (emergency, needs ER or 911); same_day (urgent, same-day visit); telehealth (can be handled via telehealth); routine (non-urgent, routine follow-up).
+- Routes: agent (call center agent handles it); nurse (transfer to nurse line); er_instruction (instruct caller to go to the ER or call 911); self_service (caller can use self-service options).
+
+Output rules: return only valid JSON matching the schema of the current stage. No markdown, no extra keys."""
+
+
+def build_user_message(
+    transcript: str,
+    task: str,
+    facts: Optional[str] = None,
+    char_limit: Optional[int] = None,
+) -> str:
+    """
+    Transcript first (stable prefix), then stage facts and the stage task (varying suffix).
+    char_limit cuts the transcript to an excerpt; None sends it in full.
+    """
+    parts = [f"Call transcript:\n{transcript[:char_limit]}", "---"]
+    if facts:
+        parts.append(f"Known facts: {facts}")
+    parts.append(task)
+    return "\n\n".join(parts)
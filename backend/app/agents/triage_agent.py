@@ -1,22 +1,23 @@
 """Triage agent: rule-based red flags first; if none, LLM for urgency."""
+from typing import Dict, Optional
+
+from app import tracing
+from app.agents.prompts import SHARED_SYSTEM, build_user_message
 from app.llm import call_llm_json
-from app.schemas import TriageResult, TRIAGE_JSON_SCHEMA
-from app.triage_rules import get_red_flags, get_safety_questions
+from app.schemas import TriageResult, TRIAGE_JSON_SCHEMA, StageUsage
+from app.triage_rules import get_safety_questions
 
 
-SYSTEM = """You are a healthcare triage assistant. Given a call transcript and any known red flags, determine urgency:
-- er: emergency, needs ER or 911
-- same_day: urgent, same-day visit
-- telehealth: can be handled via telehealth
-- routine: non-urgent, routine follow-up
-Provide 1-5 questions_to_ask that would help clarify urgency or safety. Be concise.
-Return only valid JSON matching the schema. No markdown, no extra keys."""
+TASK = """Task (triage): determine the urgency (er, same_day, telehealth, routine). List any red flags you detect. Provide 1-5 questions_to_ask that would help clarify urgency or safety, and short reasoning."""
 
 
+@tracing.traced("agent.triage")
 def run_triage(
     transcript: str,
     model: str,
     red_flags: list[str],
+    usage: Optional[Dict[str, StageUsage]] = None,
+    repair_model: Optional[str] = None,
 ) -> TriageResult:
     if red_flags:
         questions = get_safety_questions(red_flags)
@@ -26,5 +27,15 @@ def run_triage(
             questions_to_ask=questions,
             reasoning="Red flag detected; follow emergency protocol.",
         )
-    raw = call_llm_json(model, SYSTEM, transcript, TRIAGE_JSON_SCHEMA)
-    return TriageResult(**raw)
+    user = build_user_message(transcript, TASK, facts="No rule-based red flags were detected.")
+    raw = call_llm_json(
+        model,
+        SHARED_SYSTEM,
+        user,
+        TRIAGE_JSON_SCHEMA,
+        stage="triage",
+        usage=usage,
+        repair_model=repair_model,
+    )
+    with tracing.span("validate", schema="TriageResult"):
+        return TriageResult(**raw)
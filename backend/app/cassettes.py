@@ -0,0 +1,197 @@
+"""Record/replay of LLM chat completions for offline, deterministic benchmarks and regression runs.
+
+A cassette is a gzipped JSONL file with one entry per completion: a hash of the request
+(model, messages, response_format), the response content and token usage, the wall-clock
+latency, or the error the API raised. Replay serves entries by request hash, in recorded order
+when the same request was made more than once, optionally sleeping for the (scaled) latency.
+Recording starts a fresh cassette (an existing file at the path is replaced) and writes one
+gzip stream, closed at exit.
+"""
+from __future__ import annotations
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from app import llm
+from app.config import LLM_CASSETTE_MODE, LLM_CASSETTE_PATH, LLM_REPLAY_LATENCY_SCALE, OPENAI_API_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded response for a request (the prompt or model changed since recording)."""
+
+
+class ReplayedError(RuntimeError):
+    """An API error that was recorded and is raised again on replay (same message; type in error_type)."""
+
+    def __init__(self, message: str, error_type: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def request_key(kwargs: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {k: kwargs.get(k) for k in ("model", "messages", "response_format")},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def _schema_name(kwargs: Dict[str, Any]) -> Optional[str]:
+    return ((kwargs.get("response_format") or {}).get("json_schema") or {}).get("name")
+
+
+def _usage_to_dict(response: Any) -> Optional[Dict[str, int]]:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+    }
+
+
+def _response_from_entry(entry: Dict[str, Any]) -> Any:
+    usage = entry.get("usage")
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=entry.get("content")))],
+        usage=SimpleNamespace(
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"],
+            prompt_tokens_details=SimpleNamespace(cached_tokens=usage["cached_tokens"]),
+        )
+        if usage
+        else None,
+    )
+
+
+class CassetteRecorder:
+    """
+    Completion backend that calls OpenAI and writes each request/response pair to the cassette.
+    The file is truncated on start, so a re-recording never mixes with an older session.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[Any] = gzip.open(path, "wt", encoding="utf-8")
+        atexit.register(self.close)
+
+    def __call__(self, **kwargs: Any) -> Any:
+        entry: Dict[str, Any] = {
+            "key": request_key(kwargs),
+            "model": kwargs.get("model"),
+            "schema": _schema_name(kwargs),
+        }
+        start = time.perf_counter()
+        try:
+            response = llm.get_client().chat.completions.create(**kwargs)
+        except Exception as e:
+            entry["latency_s"] = round(time.perf_counter() - start, 4)
+            entry["error"] = str(e)
+            entry["error_type"] = type(e).__name__
+            self._append(entry)
+            raise
+        entry["latency_s"] = round(time.perf_counter() - start, 4)
+        entry["content"] = response.choices[0].message.content
+        entry["usage"] = _usage_to_dict(response)
+        self._append(entry)
+        return response
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError(f"Cassette recorder for {self.path} is closed")
+            self._file.write(line)
+
+    def close(self) -> None:
+        """Finish the gzip stream. Idempotent; also runs at interpreter exit."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassettePlayer:
+    """Completion backend that serves recorded responses; latency_scale=0 replays instantly."""
+
+    def __init__(self, path: Path, latency_scale: float = 1.0) -> None:
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._next: Dict[str, int] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+            except (EOFError, json.JSONDecodeError):
+                # A recording process that died before close() leaves a truncated stream.
+                logger.warning("Cassette %s is truncated; replaying the %d complete entries", path, len(self))
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __call__(self, **kwargs: Any) -> Any:
+        key = request_key(kwargs)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(
+                    f"No recorded response for {_schema_name(kwargs)} on {kwargs.get('model')} ({key})"
+                )
+            index = self._next.get(key, 0)
+            self._next[key] = (index + 1) % len(entries)
+        entry = entries[index]
+        if self.latency_scale > 0:
+            time.sleep(entry.get("latency_s", 0.0) * self.latency_scale)
+        if "error" in entry:
+            raise ReplayedError(entry["error"], entry.get("error_type"))
+        return _response_from_entry(entry)
+
+
+_recorder: Optional[CassetteRecorder] = None
+
+
+def install(mode: Optional[str], path: str | Path, latency_scale: float = 1.0) -> None:
+    """Route call_llm_json through a recorder or player ("record" / "replay"); None or "" restores OpenAI."""
+    global _recorder
+    path = Path(path)
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+    if not mode:
+        llm.set_completion_backend(None)
+    elif mode == "record":
+        _recorder = CassetteRecorder(path)
+        llm.set_completion_backend(_recorder)
+    elif mode == "replay":
+        player = CassettePlayer(path, latency_scale)
+        llm.set_completion_backend(player)
+        logger.info("Replaying %d LLM responses from %s", len(player), path)
+    else:
+        raise ValueError(f"Unknown LLM_CASSETTE_MODE: {mode!r} (expected 'record' or 'replay')")
+
+
+def install_from_env() -> None:
+    if LLM_CASSETTE_MODE == "record" and not OPENAI_API_KEY:
+        logger.warning("LLM_CASSETTE_MODE=record needs OPENAI_API_KEY; not recording")
+        return
+    if LLM_CASSETTE_MODE:
+        install(LLM_CASSETTE_MODE, LLM_CASSETTE_PATH, LLM_REPLAY_LATENCY_SCALE)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from dotenv import load_dotenv
 
@@ -16,6 +16,65 @@ def get_env(key: str, default: Optional[str] = None) -> Optional[str]:
     return os.environ.get(key, default)
 
 
+def get_env_bool(key: str, default: bool = False) -> bool:
+    value = get_env(key)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # Default model (use a real model name; gpt-5.2-mini may not exist yet)
 DEFAULT_MODEL: str = get_env("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_KEY: Optional[str] = get_env("OPENAI_API_KEY")
+
+# Per-stage model cascade (see app/services/cascade.py). Each stage runs on its own model
+# (OPENAI_MODEL_<STAGE>, default OPENAI_MODEL) and escalates to the stronger model when one is set.
+LLM_STAGES: tuple[str, ...] = ("intent", "triage", "orchestration", "documentation")
+STAGE_MODELS: Dict[str, str] = {
+    stage: get_env(f"OPENAI_MODEL_{stage.upper()}") or DEFAULT_MODEL for stage in LLM_STAGES
+}
+ESCALATION_MODEL: Optional[str] = get_env("OPENAI_ESCALATION_MODEL") or None
+STAGE_ESCALATION_MODELS: Dict[str, Optional[str]] = {
+    stage: get_env(f"OPENAI_ESCALATION_MODEL_{stage.upper()}", ESCALATION_MODEL) or None for stage in LLM_STAGES
+}
+INTENT_CONFIDENCE_THRESHOLD: float = float(get_env("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+# Optional JSON price overrides for the cascade report: {"model": [input, cached_input, output]} in USD per 1M tokens.
+MODEL_PRICES_JSON: Optional[str] = get_env("MODEL_PRICES_JSON")
+
+# LLM record/replay (see app/cassettes.py). Mode: "record", "replay" or unset.
+LLM_CASSETTE_MODE: Optional[str] = (get_env("LLM_CASSETTE_MODE") or "").strip().lower() or None
+LLM_CASSETTE_PATH: str = get_env("LLM_CASSETTE_PATH", "cassettes/llm.jsonl.gz") or "cassettes/llm.jsonl.gz"
+LLM_REPLAY_LATENCY_SCALE: float = float(get_env("LLM_REPLAY_LATENCY_SCALE", "1.0"))
+
+# Hedged LLM requests (see app/hedging.py). HEDGE_STAGES: comma-separated stage names, or "all".
+_hedge_stages = (get_env("HEDGE_STAGES") or "").strip()
+HEDGE_STAGES: tuple[str, ...] = (
+    LLM_STAGES if _hedge_stages == "all" else tuple(s.strip() for s in _hedge_stages.split(",") if s.strip())
+)
+HEDGE_BUDGET_RATIO: float = float(get_env("HEDGE_BUDGET_RATIO", "0.1"))
+HEDGE_MIN_SAMPLES: int = int(get_env("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_QUANTILE: float = float(get_env("HEDGE_QUANTILE", "0.9"))
+
+# Admission control for /analyze (see app/services/admission.py)
+MAX_CONCURRENT_ANALYSES: int = int(get_env("MAX_CONCURRENT_ANALYSES", "8"))
+MAX_QUEUED_ANALYSES: int = int(get_env("MAX_QUEUED_ANALYSES", "16"))
+ANALYZE_QUEUE_TIMEOUT_S: float = float(get_env("ANALYZE_QUEUE_TIMEOUT_S", "10"))
+ANALYZE_LATENCY_SLO_S: float = float(get_env("ANALYZE_LATENCY_SLO_S", "20"))
+ANALYZE_RETRY_AFTER_S: int = int(get_env("ANALYZE_RETRY_AFTER_S", "5"))
+
+# /transcribe cache: total transcript bytes kept before least recently used entries are evicted
+TRANSCRIPTION_CACHE_MAX_BYTES: int = int(get_env("TRANSCRIPTION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Startup warm-up (see app/services/warmup.py)
+STARTUP_WARMUP: bool = get_env_bool("STARTUP_WARMUP", True)
+WARMUP_LLM_PROBE: bool = get_env_bool("WARMUP_LLM_PROBE", False)
+
+# Tracing (see app/tracing.py): TRACING_EXPORTER = "file" | "otlp" | unset (disabled)
+TRACING_EXPORTER: Optional[str] = (get_env("TRACING_EXPORTER") or "").strip().lower() or None
+TRACING_FILE: str = get_env("TRACING_FILE", "traces/spans.jsonl") or "traces/spans.jsonl"
+OTLP_ENDPOINT: str = get_env("OTLP_ENDPOINT", "http://localhost:4318") or "http://localhost:4318"
+TRACING_SERVICE_NAME: str = get_env("TRACING_SERVICE_NAME", "care-navigator-backend") or "care-navigator-backend"
+
+# On-demand profiling (see app/profiling.py): off unless set; send X-Profile with this token
+PROFILE_TOKEN: Optional[str] = get_env("PROFILE_TOKEN") or None
+PROFILE_INTERVAL_MS: float = float(get_env("PROFILE_INTERVAL_MS", "5"))
@@ -0,0 +1,128 @@
+"""Hedged LLM requests: if a call is slower than its stage's recent p90, fire a duplicate and take the first."""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple, TypeVar
+
+from app.config import HEDGE_BUDGET_RATIO, HEDGE_MIN_SAMPLES, HEDGE_QUANTILE, HEDGE_STAGES
+
+T = TypeVar("T")
+
+_LATENCY_WINDOW = 200
+
+
+class Hedger:
+    """
+    Per-stage hedging with an adaptive delay and a budget cap.
+
+    - The delay is the HEDGE_QUANTILE (default p90) of the stage's recent successful call latencies;
+      no hedging until HEDGE_MIN_SAMPLES calls have been observed.
+    - At most budget_ratio extra requests per call made through the hedger (e.g. 0.1 = +10%).
+    - The losing request is cancelled if it has not started; a request already in flight cannot be
+      interrupted from a worker thread, so its result is discarded when it completes.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[str] = HEDGE_STAGES,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        quantile: float = HEDGE_QUANTILE,
+        max_workers: int = 32,
+    ) -> None:
+        self.stages = frozenset(stages)
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._budget_denied = 0
+
+    def enabled(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def delay_for(self, stage: str) -> Optional[float]:
+        with self._lock:
+            return self._quantile_locked(stage)
+
+    def run(self, stage: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run fn, hedging if it outlives the stage delay. Returns (result, whether a duplicate was sent)."""
+        with self._lock:
+            self._calls += 1
+        primary = self._submit(stage, fn)
+        delay = self.delay_for(stage)
+        if delay is None or wait([primary], timeout=delay).done:
+            return primary.result(), False
+        if not self._take_budget():
+            return primary.result(), False
+
+        backup = self._submit(stage, fn)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is backup:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    return future.result(), True
+        # Both failed: surface the primary's error, as an unhedged call would have.
+        return primary.result(), True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            delays = {stage: self._quantile_locked(stage) for stage in sorted(self._latencies)}
+            return {
+                "stages": sorted(self.stages),
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "budget_denied": self._budget_denied,
+                "budget_ratio": self.budget_ratio,
+                "delay_s": {stage: None if d is None else round(d, 3) for stage, d in delays.items()},
+            }
+
+    def _quantile_locked(self, stage: str) -> Optional[float]:
+        samples = sorted(self._latencies.get(stage, ()))
+        if len(samples) < max(1, self.min_samples):
+            return None
+        return samples[min(len(samples) - 1, math.ceil(self.quantile * len(samples)) - 1)]
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.budget_ratio * self._calls:
+                self._budget_denied += 1
+                return False
+            self._hedges += 1
+            return True
+
+    def _observe(self, stage: str, latency_s: float) -> None:
+        with self._lock:
+            window = self._latencies.setdefault(stage, deque(maxlen=_LATENCY_WINDOW))
+            window.append(latency_s)
+
+    def _submit(self, stage: str, fn: Callable[[], T]) -> "Future[T]":
+        def timed() -> T:
+            start = time.perf_counter()
+            result = fn()
+            self._observe(stage, time.perf_counter() - start)
+            return result
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="llm-hedge")
+        return self._executor.submit(timed)
+
+
+hedger = Hedger()
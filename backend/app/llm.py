@@ -3,11 +3,16 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict
-
-from openai import OpenAI
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
+from app import hedging, tracing
 from app.config import OPENAI_API_KEY, DEFAULT_MODEL
+from app.schemas import LLMAttempt, StageUsage
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +25,83 @@ REPAIR_INSTRUCTION = (
 )
 
 
+@lru_cache(maxsize=1)
+def get_client() -> "OpenAI":
+    """
+    Shared OpenAI client (keeps its HTTP connection pool across requests).
+    The SDK is imported here rather than at module load: it dominates app import time.
+    """
+    from openai import OpenAI
+
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+# Replaces client.chat.completions.create when set (fake backends, cassette record/replay).
+CompletionBackend = Callable[..., Any]
+_completion_backend: Optional[CompletionBackend] = None
+
+
+def set_completion_backend(backend: Optional[CompletionBackend]) -> None:
+    """Route chat completions through backend(**kwargs) instead of OpenAI; None restores the default."""
+    global _completion_backend
+    _completion_backend = backend
+
+
+def is_configured() -> bool:
+    """True when LLM calls can run: an API key is set or a completion backend serves them."""
+    return bool(OPENAI_API_KEY) or _completion_backend is not None
+
+
+def _create_completion(**kwargs: Any) -> Any:
+    if _completion_backend is not None:
+        return _completion_backend(**kwargs)
+    return get_client().chat.completions.create(**kwargs)
+
+
+def _record_usage(
+    usage: Dict[str, StageUsage],
+    stage: str,
+    model: str,
+    latency_s: float,
+    repair: bool,
+    hedged: bool,
+    response: Any,
+) -> None:
+    stats = usage.setdefault(stage, StageUsage())
+    attempt = LLMAttempt(model=model, latency_s=round(latency_s, 3), repair=repair, hedged=hedged)
+    raw = getattr(response, "usage", None)
+    if raw is not None:
+        details = getattr(raw, "prompt_tokens_details", None)
+        attempt.prompt_tokens = raw.prompt_tokens or 0
+        attempt.completion_tokens = raw.completion_tokens or 0
+        attempt.cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    stats.calls += 1
+    stats.prompt_tokens += attempt.prompt_tokens
+    stats.cached_tokens += attempt.cached_tokens
+    stats.completion_tokens += attempt.completion_tokens
+    stats.attempts.append(attempt)
+
+
 def call_llm_json(
     model: str,
     system: str,
     user: str,
     json_schema: Dict[str, Any],
+    stage: str = "llm",
+    usage: Optional[Dict[str, StageUsage]] = None,
+    repair_model: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Call OpenAI with strict JSON Schema output. One retry with repair instruction on parse/validation failure.
+    The retry runs on repair_model when given (model cascade escalation), else on model.
     Raises clean exceptions for the pipeline to catch.
+    If usage is given, token counts (including cached prompt tokens) are accumulated under usage[stage].
+    Stages listed in HEDGE_STAGES are hedged (see app/hedging.py).
+    Each attempt is traced as llm.attempt with llm.request and llm.parse children (see app/tracing.py).
     """
-    if not OPENAI_API_KEY:
+    if _completion_backend is None and not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY is not set")
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
     schema_for_api = json_schema.get("schema", json_schema) if "schema" in json_schema else json_schema
     name = json_schema.get("name", "response")
     strict = json_schema.get("strict", True)
@@ -42,41 +110,60 @@ def call_llm_json(
         system + "\n\nReturn JSON only. No markdown. No extra keys. No code blocks."
     )
 
-    def _call(user_message: str) -> Dict[str, Any]:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_with_instruction},
-                {"role": "user", "content": user_message},
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": name,
-                    "strict": strict,
-                    "schema": schema_for_api,
+    def _call(user_message: str, call_model: str, repair: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+
+        def create() -> Any:
+            return _create_completion(
+                model=call_model,
+                messages=[
+                    {"role": "system", "content": system_with_instruction},
+                    {"role": "user", "content": user_message},
+                ],
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": name,
+                        "strict": strict,
+                        "schema": schema_for_api,
+                    },
                 },
-            },
-        )
-        choice = response.choices[0]
-        text = (choice.message.content or "").strip()
-        if not text:
-            raise ValueError("Empty response from model")
-        # Remove markdown code blocks if present
-        if text.startswith("```"):
-            lines = text.split("\n")
-            if lines[0].startswith("```"):
-                lines = lines[1:]
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]
-            text = "\n".join(lines)
-        return json.loads(text)
+            )
+
+        with tracing.span("llm.attempt", stage=stage, model=call_model, repair=repair) as attempt_span:
+            hedged = False
+            with tracing.span("llm.request"):
+                if hedging.hedger.enabled(stage):
+                    response, hedged = hedging.hedger.run(stage, create)
+                else:
+                    response = create()
+            attempt_span.set_attribute("hedged", hedged)
+            if usage is not None:
+                _record_usage(usage, stage, call_model, time.perf_counter() - start, repair, hedged, response)
+            with tracing.span("llm.parse"):
+                choice = response.choices[0]
+                text = (choice.message.content or "").strip()
+                if not text:
+                    raise ValueError("Empty response from model")
+                # Remove markdown code blocks if present
+                if text.startswith("```"):
+                    lines = text.split("\n")
+                    if lines[0].startswith("```"):
+                        lines = lines[1:]
+                    if lines and lines[-1].strip() == "```":
+                        lines = lines[:-1]
+                    text = "\n".join(lines)
+                return json.loads(text)
 
     try:
-        return _call(user)
+        return _call(user, model, repair=False)
     except (json.JSONDecodeError, ValueError, KeyError) as e:
         logger.warning("First LLM parse/validation failed: %s", e)
+        tracing.add_event("repair_retry", stage=stage, error=str(e))
+        retry_model = repair_model or model
+        if usage is not None and retry_model != model:
+            usage.setdefault(stage, StageUsage()).escalation_reason = "repair_retry"
         try:
-            return _call(user + "\n\n" + REPAIR_INSTRUCTION)
+            return _call(user + "\n\n" + REPAIR_INSTRUCTION, retry_model, repair=True)
         except (json.JSONDecodeError, ValueError, KeyError) as e2:
             raise ValueError(f"LLM response invalid after retry: {e2}") from e2
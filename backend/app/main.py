@@ -1,16 +1,46 @@
 """FastAPI app: health and analyze endpoints, CORS for Streamlit."""
+import asyncio
+import hashlib
+import json
 import os
 import tempfile
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Iterator, Optional, Union
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, Header, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from openai import OpenAI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
-from app.config import OPENAI_API_KEY
-from app.schemas import AnalyzeRequest, FullAnalysisResponse
-from app.services.pipeline import run_pipeline
+from app import profiling, tracing
+from app.config import OPENAI_API_KEY, STARTUP_WARMUP
+from app.hedging import hedger
+from app.cassettes import install_from_env
+from app.llm import get_client, is_configured
+from app.schemas import AnalyzeRequest, FullAnalysisResponse, PartialAnalysisResponse
+from app.services.cascade import cascade_stats
+from app.services.admission import AdmissionRejected, AdmissionTicket, admission_controller
+from app.services.pipeline import iter_pipeline, run_pipeline
+from app.services.transcription_cache import transcription_cache
+from app.services.warmup import is_ready, mark_ready, readiness, stop_warm_up, warm_up
 
-app = FastAPI(title="Care Navigator Agent", version="0.1.0")
+install_from_env()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Warm up in the background so /health answers (liveness) while readiness is still pending.
+    task = asyncio.create_task(asyncio.to_thread(warm_up)) if STARTUP_WARMUP else None
+    if task is None:
+        mark_ready()
+    yield
+    if task is not None and not task.done():
+        stop_warm_up()
+        task.cancel()
+
+
+app = FastAPI(title="Care Navigator Agent", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,14 +60,29 @@ def root():
     }
 
 
+WHISPER_MODEL = "whisper-1"
+WHISPER_LANGUAGE = "en"
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health() -> dict[str, Any]:
+    """Liveness: always 200 while the process serves requests. `ready` reports warm-up state."""
+    return {"status": "ok", **readiness()}
+
+
+@app.get("/health/ready")
+def health_ready() -> JSONResponse:
+    """Readiness: 503 until the startup warm-up has finished."""
+    return JSONResponse(status_code=200 if is_ready() else 503, content=readiness())
 
 
 @app.post("/transcribe")
-async def transcribe_audio(file: UploadFile = File(...)) -> dict[str, str]:
-    """Transcribe audio file using OpenAI Whisper API."""
+async def transcribe_audio(file: UploadFile = File(...)) -> dict[str, Any]:
+    """
+    Transcribe audio file using OpenAI Whisper API. Identical audio is served from the
+    transcription cache (`cached: true`), including while another upload of it is in flight.
+    """
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=503, detail="OPENAI_API_KEY is not configured")
     
@@ -51,42 +96,145 @@ async def transcribe_audio(file: UploadFile = File(...)) -> dict[str, str]:
                 raise HTTPException(status_code=400, detail=f"File must be an audio file. Got: {ext}")
     
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        # Read file content
-        contents = await file.read()
-        
-        # Create a temporary file-like object for OpenAI
+        client = get_client()
+        # Copy the (already spooled) upload to a temp file owned by this request, hashing it on
+        # the way (cache key). The copy outlives the request, so a transcription that other
+        # uploads are waiting on keeps working if this client disconnects.
+        hasher = hashlib.sha256(f"{WHISPER_MODEL}:{WHISPER_LANGUAGE}:".encode())
         suffix = os.path.splitext(file.filename or "audio.mp3")[1] or ".mp3"
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(contents)
+            try:
+                while chunk := await file.read(_UPLOAD_CHUNK_BYTES):
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
             tmp_path = tmp.name
+
+        def transcribe() -> str:
+            try:
+                # Transcribe using Whisper
+                with open(tmp_path, "rb") as audio_file:
+                    transcript_obj = client.audio.transcriptions.create(
+                        model=WHISPER_MODEL,
+                        file=audio_file,
+                        language=WHISPER_LANGUAGE,
+                    )
+                return transcript_obj.text
+            finally:
+                # Clean up temp file
+                os.unlink(tmp_path)
+
+        with tracing.span("transcribe_audio", model=WHISPER_MODEL, bytes=os.path.getsize(tmp_path)) as span:
+            # transcribe() deletes the temp file when it runs; otherwise the cache calls discard first.
+            transcript_text, cached = await transcription_cache.get_or_transcribe(
+                hasher.hexdigest(), transcribe, discard=lambda: os.unlink(tmp_path)
+            )
+            span.set_attribute("cached", cached)
         
-        try:
-            # Transcribe using Whisper
-            with open(tmp_path, "rb") as audio_file:
-                transcript_obj = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="en",  # Optional: specify language
-                )
-            transcript_text = transcript_obj.text
-        finally:
-            # Clean up temp file
-            os.unlink(tmp_path)
-        
-        return {"transcript": transcript_text}
+        return {"transcript": transcript_text, "cached": cached}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
 
-@app.post("/analyze", response_model=FullAnalysisResponse)
-def analyze(body: AnalyzeRequest) -> FullAnalysisResponse:
-    if not OPENAI_API_KEY:
+@app.get("/transcribe/cache")
+def transcription_cache_stats() -> dict:
+    """Transcription cache size, hits, misses, coalesced uploads and evictions."""
+    return transcription_cache.stats()
+
+
+@app.get("/admission")
+def admission_stats() -> dict:
+    """Queue depth, in-flight work, shed and degrade counters for /analyze."""
+    return admission_controller.stats()
+
+
+@app.get("/cascade")
+def cascade_report() -> dict:
+    """Model cascade: escalation rate by stage and reason, cost and latency saved vs. always escalating."""
+    return cascade_stats.report()
+
+
+@app.get("/hedging")
+def hedging_stats() -> dict:
+    """Hedged LLM requests: per-stage delay (recent p90), duplicates sent, backup wins, budget denials."""
+    return hedger.stats()
+
+
+_SECTIONS = ("intent", "triage", "routing", "orchestration", "documentation")
+
+
+def _to_json(result: BaseModel) -> dict[str, Any]:
+    """Dump a stage or response model; a partial response omits the sections that were not requested."""
+    if isinstance(result, PartialAnalysisResponse):
+        return result.model_dump(mode="json", exclude={s for s in _SECTIONS if getattr(result, s) is None})
+    return result.model_dump(mode="json")
+
+
+def _admit(body: AnalyzeRequest) -> AdmissionTicket:
+    if not is_configured():
         raise HTTPException(status_code=503, detail="OPENAI_API_KEY is not configured")
-    return run_pipeline(
-        transcript=body.transcript,
-        caller_context=body.caller_context,
-        channel=body.channel,
-        debug=body.debug,
-    )
+    try:
+        return admission_controller.admit(body.transcript)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+
+
+@app.post("/analyze", response_model=Union[FullAnalysisResponse, PartialAnalysisResponse])
+def analyze(body: AnalyzeRequest, x_profile: Optional[str] = Header(default=None)) -> Any:
+    """
+    Full analysis, or with `stages` only those sections (e.g. ["intent", "triage"] or ["routing"]).
+    With an `X-Profile` header (see PROFILE_TOKEN) the run is sampled and `debug.profile` holds
+    collapsed stacks for a flame graph; `debug: true` adds the trace id.
+    """
+    ticket = _admit(body)
+    profiler = profiling.SamplingProfiler() if profiling.requested(x_profile) else None
+    with ticket, profiler or nullcontext():
+        result = run_pipeline(
+            transcript=body.transcript,
+            caller_context=body.caller_context,
+            channel=body.channel,
+            debug=body.debug or profiler is not None,
+            red_flags=ticket.red_flags,
+            skip_documentation=ticket.degraded,
+            stages=body.stages,
+        )
+    if profiler is not None and result.debug is not None:
+        result.debug.profile = profiler.artifact()
+    if isinstance(result, PartialAnalysisResponse):
+        return JSONResponse(content=_to_json(result))
+    return result
 
+
+@app.post("/analyze/stream")
+def analyze_stream(body: AnalyzeRequest) -> StreamingResponse:
+    """
+    Same pipeline as /analyze, streamed as NDJSON: one {"stage": ..., "data": ...} line per agent
+    ("intent", "triage", "orchestration", "documentation"), then a final "result" line with the full response.
+    """
+    ticket = _admit(body)
+
+    def events() -> Iterator[str]:
+        with ticket:
+            for stage, result in iter_pipeline(
+                transcript=body.transcript,
+                caller_context=body.caller_context,
+                channel=body.channel,
+                debug=body.debug,
+                red_flags=ticket.red_flags,
+                skip_documentation=ticket.degraded,
+                stages=body.stages,
+            ):
+                yield json.dumps({"stage": stage, "data": _to_json(result)}) + "\n"
+
+    # release() is idempotent; the background task frees the slot if the stream is never consumed.
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(ticket.release),
+    )
@@ -0,0 +1,80 @@
+"""On-demand sampling profiler for a single request, producing collapsed stacks for flame graphs.
+
+A background thread samples the request thread's stack every PROFILE_INTERVAL_MS via
+sys._current_frames() (the same approach as py-spy's collapsed output, in-process). The result
+is "frame;frame;frame count" lines, readable by speedscope, inferno or flamegraph.pl.
+"""
+from __future__ import annotations
+
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+from app.config import PROFILE_INTERVAL_MS, PROFILE_TOKEN
+from app.schemas import ProfileArtifact
+
+_MAX_DEPTH = 128
+
+
+def requested(header_value: Optional[str]) -> bool:
+    """
+    True when the X-Profile header carries PROFILE_TOKEN. Profiling is off while PROFILE_TOKEN is
+    unset: profiles expose internal function names and file paths.
+    """
+    if not header_value or not PROFILE_TOKEN:
+        return False
+    return hmac.compare_digest(header_value.encode(), PROFILE_TOKEN.encode())
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread (the caller's, by default) from a daemon thread until stop()."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval_s: float = PROFILE_INTERVAL_MS / 1000) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval_s = interval_s
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._start = 0.0
+        self._duration_s = 0.0
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._duration_s = time.perf_counter() - self._start
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            # Keep the root end of deep stacks so samples still merge in a flame graph.
+            root_first = frames[::-1][:_MAX_DEPTH]
+            self._stacks[";".join(_label(f) for f in root_first)] += 1
+
+    def artifact(self) -> ProfileArtifact:
+        return ProfileArtifact(
+            interval_ms=round(self.interval_s * 1000, 3),
+            duration_s=round(self._duration_s, 3),
+            samples=sum(self._stacks.values()),
+            collapsed="\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common()),
+        )
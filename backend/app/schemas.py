@@ -1,17 +1,23 @@
 """Pydantic schemas and JSON Schema dicts for OpenAI Structured Outputs."""
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
 # --- Request ---
+# "routing" is route_to alone (deterministic, no orchestration LLM call).
+AnalysisStage = Literal["intent", "triage", "routing", "orchestration", "documentation"]
+
+
 class AnalyzeRequest(BaseModel):
     transcript: str
     caller_context: Optional[Dict[str, Any]] = None
     channel: Optional[str] = None  # "phone" | "chat"
     debug: Optional[bool] = None
+    # None = full pipeline; else only these (plus dependencies). An empty list is rejected (422).
+    stages: Optional[list[AnalysisStage]] = Field(default=None, min_length=1)
 
 
 # --- Intent ---
@@ -87,6 +93,10 @@ ORCHESTRATION_JSON_SCHEMA: Dict[str, Any] = {
 }
 
 
+class RoutingResult(BaseModel):
+    route_to: str  # same values as OrchestrationResult.route_to
+
+
 # --- Documentation (SOAP) ---
 class SOAPNote(BaseModel):
     S: str
@@ -127,7 +137,41 @@ DOCUMENTATION_JSON_SCHEMA: Dict[str, Any] = {
 }
 
 
+# --- Token usage (per LLM stage) ---
+class LLMAttempt(BaseModel):
+    model: str
+    latency_s: float
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    repair: bool = False  # the repair retry after a parse/validation failure
+    hedged: bool = False  # a duplicate request was sent because this one was slow
+
+
+class StageUsage(BaseModel):
+    calls: int = 0  # includes the repair retry
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # prompt tokens served from the provider's prefix cache
+    completion_tokens: int = 0
+    attempts: list[LLMAttempt] = Field(default_factory=list)
+    escalation_reason: Optional[str] = None  # set when the stage was re-run on the escalation model
+
+
 # --- Full API response ---
+# --- Debug info (AnalyzeRequest.debug, or an X-Profile request header on /analyze) ---
+class ProfileArtifact(BaseModel):
+    format: Literal["collapsed"] = "collapsed"
+    interval_ms: float
+    duration_s: float
+    samples: int
+    collapsed: str  # "frame;frame;frame count" per line, root first (flame graph input)
+
+
+class DebugInfo(BaseModel):
+    trace_id: Optional[str] = None
+    profile: Optional[ProfileArtifact] = None
+
+
 class FullAnalysisResponse(BaseModel):
     request_id: str
     intent: IntentResult
@@ -138,3 +182,22 @@ class FullAnalysisResponse(BaseModel):
     model_used: str
     warnings: list[str] = Field(default_factory=list)
     errors: list[str] = Field(default_factory=list)
+    usage: Dict[str, StageUsage] = Field(default_factory=dict)
+    debug: Optional[DebugInfo] = None
+
+
+# --- Partial API response (AnalyzeRequest.stages set; unrequested sections are omitted from the JSON) ---
+class PartialAnalysisResponse(BaseModel):
+    request_id: str
+    stages: list[AnalysisStage]
+    intent: Optional[IntentResult] = None
+    triage: Optional[TriageResult] = None
+    routing: Optional[RoutingResult] = None
+    orchestration: Optional[OrchestrationResult] = None
+    documentation: Optional[DocumentationResult] = None
+    latency_s: float
+    model_used: str
+    warnings: list[str] = Field(default_factory=list)
+    errors: list[str] = Field(default_factory=list)
+    usage: Dict[str, StageUsage] = Field(default_factory=dict)
+    debug: Optional[DebugInfo] = None
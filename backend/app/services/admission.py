@@ -0,0 +1,194 @@
+"""Urgency-aware admission control for /analyze: priority queueing, load shedding, degradation."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import (
+    ANALYZE_LATENCY_SLO_S,
+    ANALYZE_QUEUE_TIMEOUT_S,
+    ANALYZE_RETRY_AFTER_S,
+    MAX_CONCURRENT_ANALYSES,
+    MAX_QUEUED_ANALYSES,
+)
+from app.triage_rules import get_red_flags, mentions_symptoms
+
+# Lower value = served first. ER-flagged work bypasses the concurrency limit entirely and is
+# never queued; symptom calls queue ahead of routine (scheduling, billing, refill) calls.
+PRIORITY_ER = 0
+PRIORITY_SYMPTOMS = 1
+PRIORITY_ROUTINE = 2
+PRIORITY_NAMES = {PRIORITY_ER: "er", PRIORITY_SYMPTOMS: "symptoms", PRIORITY_ROUTINE: "routine"}
+
+# Weight of the newest observation in the latency moving average.
+_LATENCY_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; the API maps this to 503 with Retry-After."""
+
+    def __init__(self, reason: str, retry_after_s: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+def classify_priority(transcript: str, red_flags: list[str]) -> int:
+    if red_flags:
+        return PRIORITY_ER
+    return PRIORITY_SYMPTOMS if mentions_symptoms(transcript) else PRIORITY_ROUTINE
+
+
+class AdmissionTicket:
+    """Held for the duration of one pipeline run. Releases its slot on exit."""
+
+    def __init__(
+        self,
+        controller: "AdmissionController",
+        priority: int,
+        red_flags: list[str],
+        degraded: bool,
+        queued_s: float,
+    ) -> None:
+        self._controller = controller
+        self._start = time.perf_counter()
+        self._released = False
+        self.priority = priority
+        self.red_flags = red_flags
+        self.degraded = degraded
+        self.queued_s = queued_s
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.perf_counter() - self._start)
+
+    def __enter__(self) -> "AdmissionTicket":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """
+    Bounded-concurrency gate with a priority queue in front of run_pipeline.
+
+    - ER-flagged requests (rule-based red flags) are admitted immediately, even above the limit.
+    - Other requests queue by tier (symptom calls before routine ones), FIFO within a tier; they
+      are shed when the queue is full or the wait exceeds queue_timeout_s.
+    - While the observed pipeline latency exceeds the SLO, admitted non-ER work is degraded
+      (documentation is skipped).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_ANALYSES,
+        max_queued: int = MAX_QUEUED_ANALYSES,
+        queue_timeout_s: float = ANALYZE_QUEUE_TIMEOUT_S,
+        latency_slo_s: float = ANALYZE_LATENCY_SLO_S,
+        retry_after_s: int = ANALYZE_RETRY_AFTER_S,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout_s = queue_timeout_s
+        self.latency_slo_s = latency_slo_s
+        self.retry_after_s = retry_after_s
+
+        self._cond = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._latency_ewma: Optional[float] = None
+        self._admitted: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._shed: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+        self._degraded = 0
+
+    def admit(self, transcript: str) -> AdmissionTicket:
+        """Run the red-flag check and wait for a slot. Raises AdmissionRejected when shed."""
+        red_flags = get_red_flags(transcript)
+        priority = classify_priority(transcript, red_flags)
+        enqueued = time.perf_counter()
+
+        with self._cond:
+            if priority == PRIORITY_ER:
+                return self._grant(priority, red_flags, enqueued)
+
+            if not self._waiters and self._in_flight < self.max_concurrent:
+                return self._grant(priority, red_flags, enqueued)
+
+            if len(self._waiters) >= self.max_queued:
+                self._shed["queue_full"] += 1
+                raise AdmissionRejected("Analysis queue is full", self.retry_after_s)
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            deadline = enqueued + self.queue_timeout_s
+            while not (self._waiters[0] == entry and self._in_flight < self.max_concurrent):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._shed["queue_timeout"] += 1
+                    # The head may have changed; let the next waiter re-check.
+                    self._cond.notify_all()
+                    raise AdmissionRejected("Timed out waiting for analysis capacity", self.retry_after_s)
+                self._cond.wait(remaining)
+            heapq.heappop(self._waiters)
+            ticket = self._grant(priority, red_flags, enqueued)
+            self._cond.notify_all()
+            return ticket
+
+    def _grant(self, priority: int, red_flags: list[str], enqueued: float) -> AdmissionTicket:
+        # Caller holds self._cond.
+        self._in_flight += 1
+        self._admitted[priority] += 1
+        degraded = (
+            priority != PRIORITY_ER
+            and self._latency_ewma is not None
+            and self._latency_ewma > self.latency_slo_s
+        )
+        if degraded:
+            self._degraded += 1
+        return AdmissionTicket(
+            self,
+            priority=priority,
+            red_flags=red_flags,
+            degraded=degraded,
+            queued_s=time.perf_counter() - enqueued,
+        )
+
+    def _release(self, latency_s: float) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if self._latency_ewma is None:
+                self._latency_ewma = latency_s
+            else:
+                self._latency_ewma += _LATENCY_EWMA_ALPHA * (latency_s - self._latency_ewma)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queued_by_priority = {PRIORITY_NAMES[p]: 0 for p in (PRIORITY_SYMPTOMS, PRIORITY_ROUTINE)}
+            for priority, _ in self._waiters:
+                queued_by_priority[PRIORITY_NAMES[priority]] += 1
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrent": self.max_concurrent,
+                "queue_depth": len(self._waiters),
+                "queue_depth_by_priority": queued_by_priority,
+                "max_queued": self.max_queued,
+                "admitted": {PRIORITY_NAMES[p]: n for p, n in self._admitted.items()},
+                "shed": dict(self._shed),
+                "shed_total": sum(self._shed.values()),
+                "degraded": self._degraded,
+                "latency_ewma_s": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                "latency_slo_s": self.latency_slo_s,
+            }
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,158 @@
+"""Model cascade: run each stage on its (cheap) model, escalate to a stronger one when needed.
+
+Escalation triggers: low intent confidence, an LLM triage that lists red flags with low urgency,
+or a failed first parse (the repair retry runs on the escalation model, see call_llm_json).
+An escalated triage never lowers urgency (see more_urgent).
+CascadeStats compares what was spent against always running the escalation model.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from app.config import LLM_STAGES, MODEL_PRICES_JSON, STAGE_ESCALATION_MODELS, STAGE_MODELS
+from app.schemas import LLMAttempt, StageUsage, TriageResult
+
+# USD per 1M tokens: (input, cached input, output). Extend or override with MODEL_PRICES_JSON.
+MODEL_PRICES_PER_1M: Dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+if MODEL_PRICES_JSON:
+    MODEL_PRICES_PER_1M.update({m: tuple(p) for m, p in json.loads(MODEL_PRICES_JSON).items()})
+
+
+def stage_model(stage: str) -> str:
+    return STAGE_MODELS[stage]
+
+
+def escalation_model(stage: str) -> Optional[str]:
+    """The stronger model for this stage, or None when the stage does not cascade."""
+    model = STAGE_ESCALATION_MODELS.get(stage)
+    return model if model and model != stage_model(stage) else None
+
+
+_URGENCY_RANK = {"routine": 0, "telehealth": 1, "same_day": 2, "er": 3}
+
+
+def triage_escalation_reason(triage: TriageResult, red_flags: list[str]) -> Optional[str]:
+    """
+    Reason to re-check an LLM triage on the escalation model, else None. Only triggers whose
+    outcome can change are escalated: the result is merged with more_urgent, so an ER verdict
+    (already the highest urgency) is never re-checked. With rule red flags the triage came from
+    the rules, not the LLM.
+    """
+    if red_flags:
+        return None
+    if triage.red_flags_detected and triage.urgency in ("telehealth", "routine"):
+        return "red_flags_with_low_urgency"
+    return None
+
+
+def more_urgent(first: TriageResult, second: TriageResult) -> TriageResult:
+    """The more urgent of two triage results (first on a tie): escalation must never lower urgency."""
+    return second if _URGENCY_RANK[second.urgency] > _URGENCY_RANK[first.urgency] else first
+
+
+def attempt_cost(attempt: LLMAttempt, model: Optional[str] = None) -> Optional[float]:
+    """USD cost of an attempt's tokens priced as `model` (default: the model that ran). None if unpriced."""
+    prices = MODEL_PRICES_PER_1M.get(model or attempt.model)
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    uncached = attempt.prompt_tokens - attempt.cached_tokens
+    return (
+        uncached * input_price + attempt.cached_tokens * cached_price + attempt.completion_tokens * output_price
+    ) / 1_000_000
+
+
+class CascadeStats:
+    """Process-wide escalation counters and savings versus always using the escalation model."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._escalated_requests = 0
+        self._escalations: Dict[str, Dict[str, int]] = {stage: {} for stage in LLM_STAGES}
+        self._cost_actual = 0.0
+        self._cost_baseline = 0.0
+        self._unpriced_attempts = 0
+        # Latency bookkeeping per stage; the baseline uses the observed mean of escalation-model attempts.
+        self._large_latency = {stage: [0.0, 0] for stage in LLM_STAGES}  # [sum, count]
+        self._cheap_kept = {stage: [0.0, 0] for stage in LLM_STAGES}  # cheap attempts whose result was kept
+        self._cheap_wasted_s = {stage: 0.0 for stage in LLM_STAGES}  # cheap attempts superseded by escalation
+
+    def record(self, usage: Dict[str, StageUsage]) -> None:
+        with self._lock:
+            self._requests += 1
+            if any(u.escalation_reason for u in usage.values()):
+                self._escalated_requests += 1
+            for stage, stats in usage.items():
+                large = escalation_model(stage) if stage in STAGE_MODELS else None
+                if large is None:
+                    continue
+                if stats.escalation_reason:
+                    reasons = self._escalations[stage]
+                    reasons[stats.escalation_reason] = reasons.get(stats.escalation_reason, 0) + 1
+                for attempt in stats.attempts:
+                    on_large = attempt.model == large
+                    actual = attempt_cost(attempt)
+                    if on_large:
+                        baseline = actual
+                    elif stats.escalation_reason:
+                        baseline = 0.0  # superseded cheap call: always-large would not have made it
+                    else:
+                        baseline = attempt_cost(attempt, large)
+                    if actual is None or baseline is None:
+                        self._unpriced_attempts += 1
+                    else:
+                        self._cost_actual += actual
+                        self._cost_baseline += baseline
+
+                    if on_large:
+                        self._large_latency[stage][0] += attempt.latency_s
+                        self._large_latency[stage][1] += 1
+                    elif stats.escalation_reason:
+                        self._cheap_wasted_s[stage] += attempt.latency_s
+                    else:
+                        self._cheap_kept[stage][0] += attempt.latency_s
+                        self._cheap_kept[stage][1] += 1
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            latency_saved = 0.0
+            no_baseline: list[str] = []
+            for stage in LLM_STAGES:
+                kept_s, kept_n = self._cheap_kept[stage]
+                large_s, large_n = self._large_latency[stage]
+                if kept_n and not large_n:
+                    no_baseline.append(stage)
+                    continue
+                large_mean = large_s / large_n if large_n else 0.0
+                latency_saved += kept_n * large_mean - kept_s - self._cheap_wasted_s[stage]
+            return {
+                "requests": self._requests,
+                "escalated_requests": self._escalated_requests,
+                "escalation_rate": round(self._escalated_requests / self._requests, 4) if self._requests else None,
+                "escalations_by_stage": {s: dict(r) for s, r in self._escalations.items()},
+                "models": {s: {"model": stage_model(s), "escalation_model": escalation_model(s)} for s in LLM_STAGES},
+                "cost_usd": {
+                    "actual": round(self._cost_actual, 6),
+                    "always_escalation_model": round(self._cost_baseline, 6),
+                    "saved": round(self._cost_baseline - self._cost_actual, 6),
+                    "unpriced_attempts": self._unpriced_attempts,
+                },
+                "latency_s": {
+                    "saved_total": round(latency_saved, 3),
+                    "saved_per_request": round(latency_saved / self._requests, 3) if self._requests else None,
+                    # Stages with no escalation-model calls yet have no latency baseline and are left out.
+                    "stages_without_baseline": no_baseline,
+                },
+            }
+
+
+cascade_stats = CascadeStats()
@@ -1,24 +1,92 @@
 """Agentic pipeline: intent -> triage (rules then LLM) -> orchestrator -> documentation."""
 from __future__ import annotations
 
+import contextvars
 import time
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar, Union
 
-from app.config import DEFAULT_MODEL
+from pydantic import BaseModel
+
+from app import tracing
+from app.config import DEFAULT_MODEL, INTENT_CONFIDENCE_THRESHOLD
 from app.schemas import (
+    DebugInfo,
     FullAnalysisResponse,
+    PartialAnalysisResponse,
+    RoutingResult,
     IntentResult,
     TriageResult,
     OrchestrationResult,
     DocumentationResult,
     SOAPNote,
+    StageUsage,
 )
 from app.triage_rules import get_red_flags
 from app.agents.intent_agent import run_intent
 from app.agents.triage_agent import run_triage
-from app.agents.orchestrator import run_orchestrator
+from app.agents.orchestrator import decide_route, run_orchestrator
 from app.agents.documentation_agent import run_documentation
+from app.services.cascade import (
+    cascade_stats,
+    escalation_model,
+    more_urgent,
+    stage_model,
+    triage_escalation_reason,
+)
+
+T = TypeVar("T")
+
+# Selectable stages (AnalyzeRequest.stages) and the stages each one needs computed first.
+STAGE_DEPENDENCIES: Dict[str, tuple[str, ...]] = {
+    "intent": (),
+    "triage": (),
+    "routing": ("intent", "triage"),
+    "orchestration": ("intent", "triage"),
+    "documentation": ("intent", "triage", "orchestration"),
+}
+
+
+def resolve_stages(requested: Iterable[str]) -> set[str]:
+    """Requested stages plus everything they depend on."""
+    needed: set[str] = set()
+    pending = list(requested)
+    while pending:
+        stage = pending.pop()
+        if stage not in needed:
+            needed.add(stage)
+            pending.extend(STAGE_DEPENDENCIES[stage])
+    return needed
+
+
+def _escalate(
+    stage: str,
+    reason: str,
+    usage: Dict[str, StageUsage],
+    warnings: list[str],
+    run: Callable[[str], T],
+) -> Optional[T]:
+    """Re-run a stage on its escalation model. Returns None (keep the first result) if that fails."""
+    usage.setdefault(stage, StageUsage()).escalation_reason = reason
+    try:
+        return run(escalation_model(stage))  # type: ignore[arg-type]
+    except Exception as e:
+        warnings.append(f"{stage.title()} escalation ({reason}) failed; kept first result: {str(e)}")
+        return None
+
+
+def _can_escalate(stage: str, usage: Dict[str, StageUsage]) -> bool:
+    # Not when the stage has no escalation model or the repair retry already ran on it.
+    return escalation_model(stage) is not None and not (stage in usage and usage[stage].escalation_reason)
+
+
+def _models_used(usage: Dict[str, StageUsage]) -> str:
+    models: list[str] = []
+    for stats in usage.values():
+        for attempt in stats.attempts:
+            if attempt.model not in models:
+                models.append(attempt.model)
+    return ", ".join(models) or DEFAULT_MODEL
 
 
 def run_pipeline(
@@ -26,95 +94,268 @@ def run_pipeline(
     caller_context: Optional[Dict[str, Any]] = None,
     channel: Optional[str] = None,
     debug: Optional[bool] = None,
-) -> FullAnalysisResponse:
+    red_flags: Optional[list[str]] = None,
+    skip_documentation: bool = False,
+    stages: Optional[Iterable[str]] = None,
+) -> Union[FullAnalysisResponse, PartialAnalysisResponse]:
+    for stage, result in iter_pipeline(
+        transcript,
+        caller_context=caller_context,
+        channel=channel,
+        debug=debug,
+        red_flags=red_flags,
+        skip_documentation=skip_documentation,
+        stages=stages,
+    ):
+        if stage == "result":
+            return result  # type: ignore[return-value]
+    raise RuntimeError("Pipeline finished without a result")
+
+
+def iter_pipeline(
+    transcript: str,
+    caller_context: Optional[Dict[str, Any]] = None,
+    channel: Optional[str] = None,
+    debug: Optional[bool] = None,
+    red_flags: Optional[list[str]] = None,
+    skip_documentation: bool = False,
+    stages: Optional[Iterable[str]] = None,
+) -> Iterator[Tuple[str, BaseModel]]:
+    """
+    Run the pipeline step by step, yielding (stage, result) as each agent finishes:
+    "intent", "triage", "orchestration", "documentation", then "result" with the full response.
+
+    With stages, only those stages and their dependencies run; events are yielded for the
+    requested stages only, and the result is a PartialAnalysisResponse without the other sections.
+
+    The run is traced as one "pipeline" span. Every step runs in the same context, so spans stay
+    nested even when a streaming response advances the generator from different worker threads.
+    """
+    context = contextvars.copy_context()
+    steps = _traced_steps(transcript, caller_context, channel, debug, red_flags, skip_documentation, stages)
+    try:
+        while True:
+            try:
+                item = context.run(next, steps)
+            except StopIteration:
+                return
+            yield item
+    finally:
+        context.run(steps.close)
+
+
+def _traced_steps(
+    transcript: str,
+    caller_context: Optional[Dict[str, Any]],
+    channel: Optional[str],
+    debug: Optional[bool],
+    red_flags: Optional[list[str]],
+    skip_documentation: bool,
+    stages: Optional[Iterable[str]],
+) -> Iterator[Tuple[str, BaseModel]]:
+    with tracing.span("pipeline", channel=channel or "", stages=",".join(sorted(stages or ()))) as root:
+        for stage, result in _pipeline_steps(transcript, debug, red_flags, skip_documentation, stages):
+            if stage == "result":
+                root.set_attribute("request_id", result.request_id)  # type: ignore[attr-defined]
+                root.set_attribute("errors", len(result.errors))  # type: ignore[attr-defined]
+            yield stage, result
+
+
+def _pipeline_steps(
+    transcript: str,
+    debug: Optional[bool],
+    red_flags: Optional[list[str]],
+    skip_documentation: bool,
+    stages: Optional[Iterable[str]],
+) -> Iterator[Tuple[str, BaseModel]]:
     request_id = str(uuid.uuid4())
-    model = DEFAULT_MODEL
     start = time.perf_counter()
     warnings: list[str] = []
     errors: list[str] = []
+    usage: Dict[str, StageUsage] = {}
+    requested = set(stages) if stages is not None else set(STAGE_DEPENDENCIES) - {"routing"}
+    needed = resolve_stages(requested)
 
     intent: Optional[IntentResult] = None
     triage: Optional[TriageResult] = None
+    routing: Optional[RoutingResult] = None
     orchestration: Optional[OrchestrationResult] = None
     documentation: Optional[DocumentationResult] = None
 
     # Step 1: Intent
-    try:
-        intent = run_intent(transcript, model)
-    except Exception as e:
-        errors.append(f"Intent: {str(e)}")
-        intent = IntentResult(intent="symptoms", confidence=0.0, reason="Fallback after error.")
+    if "intent" in needed:
+        try:
+            intent = run_intent(
+                transcript,
+                stage_model("intent"),
+                usage=usage,
+                repair_model=escalation_model("intent"),
+            )
+            if intent.confidence < INTENT_CONFIDENCE_THRESHOLD and _can_escalate("intent", usage):
+                intent = _escalate(
+                    "intent",
+                    "low_confidence",
+                    usage,
+                    warnings,
+                    lambda m: run_intent(transcript, m, usage=usage),
+                ) or intent
+        except Exception as e:
+            errors.append(f"Intent: {str(e)}")
+            tracing.add_event("fallback", stage="intent", error=str(e))
+            intent = IntentResult(intent="symptoms", confidence=0.0, reason="Fallback after error.")
 
-    if not intent:
-        intent = IntentResult(intent="symptoms", confidence=0.0, reason="Fallback.")
+        if not intent:
+            intent = IntentResult(intent="symptoms", confidence=0.0, reason="Fallback.")
+        if "intent" in requested:
+            yield "intent", intent
 
-    # Step 2: Triage (rules first)
-    red_flags = get_red_flags(transcript)
-    try:
-        triage = run_triage(transcript, model, red_flags)
-    except Exception as e:
-        errors.append(f"Triage: {str(e)}")
-        triage = TriageResult(
-            urgency="routine",
-            red_flags_detected=red_flags,
-            questions_to_ask=[],
-            reasoning="Fallback after error.",
-        )
-    if not triage:
-        triage = TriageResult(
-            urgency="routine",
-            red_flags_detected=red_flags,
-            questions_to_ask=[],
-            reasoning="Fallback.",
-        )
+    # Step 2: Triage (rules first; admission control may already have run them)
+    if "triage" in needed:
+        if red_flags is None:
+            red_flags = get_red_flags(transcript)
+        try:
+            triage = run_triage(
+                transcript,
+                stage_model("triage"),
+                red_flags,
+                usage=usage,
+                repair_model=escalation_model("triage"),
+            )
+            reason = triage_escalation_reason(triage, red_flags)
+            if reason and _can_escalate("triage", usage):
+                second = _escalate(
+                    "triage",
+                    reason,
+                    usage,
+                    warnings,
+                    lambda m: run_triage(transcript, m, red_flags, usage=usage),
+                )
+                if second is not None:
+                    kept = more_urgent(triage, second)
+                    if second.urgency != triage.urgency:
+                        warnings.append(
+                            f"Triage escalation ({reason}) disagreed: {triage.urgency} vs {second.urgency}; "
+                            f"kept the more urgent ({kept.urgency})."
+                        )
+                    triage = kept
+        except Exception as e:
+            errors.append(f"Triage: {str(e)}")
+            tracing.add_event("fallback", stage="triage", error=str(e))
+            triage = TriageResult(
+                urgency="routine",
+                red_flags_detected=red_flags,
+                questions_to_ask=[],
+                reasoning="Fallback after error.",
+            )
+        if not triage:
+            triage = TriageResult(
+                urgency="routine",
+                red_flags_detected=red_flags,
+                questions_to_ask=[],
+                reasoning="Fallback.",
+            )
+        if "triage" in requested:
+            yield "triage", triage
+
+    # Routing only (deterministic, no LLM call)
+    if "routing" in needed and intent and triage:
+        routing = RoutingResult(route_to=decide_route(intent, triage))
+        yield "routing", routing
 
     # Step 3: Orchestrator
-    try:
-        orchestration = run_orchestrator(transcript, intent, triage, model)
-    except Exception as e:
-        errors.append(f"Orchestration: {str(e)}")
-        route = "er_instruction" if triage.urgency == "er" else "agent"
-        orchestration = OrchestrationResult(
-            route_to=route,
-            next_best_actions=[],
-            suggested_script=[],
-            escalation_reason=None,
-        )
-    if not orchestration:
-        orchestration = OrchestrationResult(
-            route_to="agent",
-            next_best_actions=[],
-            suggested_script=[],
-            escalation_reason=None,
-        )
+    if "orchestration" in needed and intent and triage:
+        try:
+            orchestration = run_orchestrator(
+                transcript,
+                intent,
+                triage,
+                stage_model("orchestration"),
+                usage=usage,
+                repair_model=escalation_model("orchestration"),
+            )
+        except Exception as e:
+            errors.append(f"Orchestration: {str(e)}")
+            tracing.add_event("fallback", stage="orchestration", error=str(e))
+            route = "er_instruction" if triage.urgency == "er" else "agent"
+            orchestration = OrchestrationResult(
+                route_to=route,
+                next_best_actions=[],
+                suggested_script=[],
+                escalation_reason=None,
+            )
+        if not orchestration:
+            orchestration = OrchestrationResult(
+                route_to="agent",
+                next_best_actions=[],
+                suggested_script=[],
+                escalation_reason=None,
+            )
+        if "orchestration" in requested:
+            yield "orchestration", orchestration
 
-    # Step 4: Documentation
-    try:
-        documentation = run_documentation(transcript, intent, triage, orchestration, model)
-    except Exception as e:
-        errors.append(f"Documentation: {str(e)}")
-        documentation = DocumentationResult(
-            summary_bullets=[],
-            soap=SOAPNote(S="", O="", A="", P=""),
-            follow_up_tasks=[],
-        )
-    if not documentation:
-        documentation = DocumentationResult(
-            summary_bullets=[],
-            soap=SOAPNote(S="", O="", A="", P=""),
-            follow_up_tasks=[],
-        )
+    # Step 4: Documentation (skipped when admission control degrades the request)
+    if "documentation" in needed and intent and triage and orchestration:
+        if skip_documentation:
+            warnings.append("Documentation skipped: service is under load.")
+        else:
+            try:
+                documentation = run_documentation(
+                    transcript,
+                    intent,
+                    triage,
+                    orchestration,
+                    stage_model("documentation"),
+                    usage=usage,
+                    repair_model=escalation_model("documentation"),
+                )
+            except Exception as e:
+                errors.append(f"Documentation: {str(e)}")
+                tracing.add_event("fallback", stage="documentation", error=str(e))
+                documentation = DocumentationResult(
+                    summary_bullets=[],
+                    soap=SOAPNote(S="", O="", A="", P=""),
+                    follow_up_tasks=[],
+                )
+        if not documentation:
+            documentation = DocumentationResult(
+                summary_bullets=[],
+                soap=SOAPNote(S="", O="", A="", P=""),
+                follow_up_tasks=[],
+            )
+        yield "documentation", documentation
 
     latency_s = time.perf_counter() - start
+    cascade_stats.record(usage)
+    debug_info = DebugInfo(trace_id=tracing.current_trace_id()) if debug else None
+
+    if stages is not None:
+        yield "result", PartialAnalysisResponse(
+            request_id=request_id,
+            stages=sorted(requested, key=list(STAGE_DEPENDENCIES).index),
+            intent=intent if "intent" in requested else None,
+            triage=triage if "triage" in requested else None,
+            routing=routing,
+            orchestration=orchestration if "orchestration" in requested else None,
+            documentation=documentation,
+            latency_s=round(latency_s, 3),
+            model_used=_models_used(usage),
+            warnings=warnings,
+            errors=errors,
+            usage=usage,
+            debug=debug_info,
+        )
+        return
 
-    return FullAnalysisResponse(
+    yield "result", FullAnalysisResponse(
         request_id=request_id,
         intent=intent,
         triage=triage,
         orchestration=orchestration,
         documentation=documentation,
         latency_s=round(latency_s, 3),
-        model_used=model,
+        model_used=_models_used(usage),
         warnings=warnings,
         errors=errors,
+        usage=usage,
+        debug=debug_info,
     )
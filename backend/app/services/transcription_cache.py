@@ -0,0 +1,101 @@
+"""Transcription cache for /transcribe: content-hash lookup, size-bounded LRU, coalesced concurrent uploads."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import TRANSCRIPTION_CACHE_MAX_BYTES
+
+
+class TranscriptionCache:
+    """
+    Maps an audio content hash to its transcript. Evicts least recently used entries once the
+    stored transcripts exceed max_bytes. Concurrent misses for the same key share one transcription.
+    Used only from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_bytes: int = TRANSCRIPTION_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._in_flight: Dict[str, "asyncio.Task[str]"] = {}
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        size = _entry_size(key, text)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= _entry_size(key, self._entries.pop(key))
+        self._entries[key] = text
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_text = self._entries.popitem(last=False)
+            self._bytes -= _entry_size(old_key, old_text)
+            self._evictions += 1
+
+    async def get_or_transcribe(
+        self,
+        key: str,
+        transcribe: Callable[[], str],
+        discard: Optional[Callable[[], None]] = None,
+    ) -> Tuple[str, bool]:
+        """
+        Return (transcript, cached). cached is True for a cache hit or when another in-flight upload
+        of the same audio produced it; only when False was transcribe called (in a worker thread).
+        discard is called right away, before any await, when transcribe will not be called for
+        this request (hit or coalesced), so per-request resources are released even if the
+        shared transcription fails or the caller is cancelled.
+        """
+        text = self.get(key)
+        if text is not None:
+            self._hits += 1
+            if discard is not None:
+                discard()
+            return text, True
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._coalesced += 1
+            if discard is not None:
+                discard()
+            # shield: a disconnecting client must not cancel the transcription others are waiting on.
+            return await asyncio.shield(task), True
+        self._misses += 1
+        task = asyncio.create_task(asyncio.to_thread(transcribe))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: str, task: "asyncio.Task[str]") -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "in_flight": len(self._in_flight),
+        }
+
+
+def _entry_size(key: str, text: str) -> int:
+    return len(key) + len(text.encode("utf-8"))
+
+
+transcription_cache = TranscriptionCache()
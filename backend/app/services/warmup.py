@@ -0,0 +1,120 @@
+"""Startup warm-up: pay one-time costs before the first real request, and track readiness."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import DEFAULT_MODEL, OPENAI_API_KEY, WARMUP_LLM_PROBE
+from app.llm import call_llm_json, get_client
+from app.schemas import AnalyzeRequest, FullAnalysisResponse
+from app.triage_rules import get_red_flags, get_safety_questions
+
+logger = logging.getLogger(__name__)
+
+_PROBE_SCHEMA: Dict[str, Any] = {
+    "name": "probe",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {"ok": {"type": "boolean"}},
+        "required": ["ok"],
+        "additionalProperties": False,
+    },
+}
+
+_SAMPLE_RESPONSE: Dict[str, Any] = {
+    "request_id": "warmup",
+    "intent": {"intent": "symptoms", "confidence": 1.0, "reason": "warmup"},
+    "triage": {"urgency": "er", "red_flags_detected": ["chest pain"], "questions_to_ask": [], "reasoning": "warmup"},
+    "orchestration": {"route_to": "er_instruction", "next_best_actions": [], "suggested_script": [], "escalation_reason": None},
+    "documentation": {"summary_bullets": [], "soap": {"S": "", "O": "", "A": "", "P": ""}, "follow_up_tasks": []},
+    "latency_s": 0.0,
+    "model_used": DEFAULT_MODEL,
+}
+
+# Errors a retry cannot fix (bad key, no access, unknown model, rejected request): stay not ready.
+_PERMANENT_ERRORS = frozenset({"AuthenticationError", "PermissionDeniedError", "NotFoundError", "BadRequestError"})
+_RETRY_BASE_S = 1.0
+_RETRY_MAX_S = 60.0
+
+_state: Dict[str, Any] = {"ready": False, "warmup_s": None, "error": None, "attempts": 0, "retrying": False}
+_stop = threading.Event()
+
+
+def is_ready() -> bool:
+    return bool(_state["ready"])
+
+
+def readiness() -> Dict[str, Any]:
+    return dict(_state)
+
+
+def mark_ready() -> None:
+    """Used when warm-up is disabled: the app is ready as soon as it serves requests."""
+    _state["ready"] = True
+
+
+def stop_warm_up() -> None:
+    """Stop a warm-up that is waiting to retry (app shutdown)."""
+    _stop.set()
+
+
+def _is_permanent(error: Exception) -> bool:
+    # Replayed cassette errors carry the original type name in error_type.
+    return (getattr(error, "error_type", None) or type(error).__name__) in _PERMANENT_ERRORS
+
+
+def warm_up(llm_probe: Optional[bool] = None, retry_max_s: float = _RETRY_MAX_S) -> None:
+    """
+    Exercise the red-flag rules and the request/response validators, import the OpenAI SDK and
+    build the shared client, and optionally send a tiny LLM probe. Never raises.
+
+    A failed client or probe step is retried with exponential backoff (1 s doubling, capped at
+    retry_max_s) until it succeeds, so a transient timeout only delays readiness. Local-step
+    failures and permanent API errors (e.g. an invalid key) stop the retries: the service stays
+    not ready and /health/ready keeps returning 503 with the `error`.
+    """
+    start = time.perf_counter()
+    probe = WARMUP_LLM_PROBE if llm_probe is None else llm_probe
+    try:
+        flags = get_red_flags("warm-up: chest pain and shortness of breath")
+        get_safety_questions(flags)
+        AnalyzeRequest.model_validate({"transcript": "warm-up"}).model_dump_json()
+        FullAnalysisResponse.model_validate(_SAMPLE_RESPONSE).model_dump_json()
+    except Exception as e:
+        logger.warning("Warm-up step failed: %s", e)
+        _finish(start, str(e))
+        return
+
+    delay = _RETRY_BASE_S
+    while True:
+        _state["attempts"] += 1
+        try:
+            if OPENAI_API_KEY:
+                get_client()
+                if probe:
+                    call_llm_json(DEFAULT_MODEL, "Health probe.", 'Reply with {"ok": true}.', _PROBE_SCHEMA)
+        except Exception as e:
+            _state["error"] = str(e)
+            if _is_permanent(e):
+                logger.warning("Warm-up failed permanently: %s", e)
+                break
+            logger.warning("Warm-up attempt %d failed, retrying in %.0fs: %s", _state["attempts"], delay, e)
+            _state["retrying"] = True
+            if _stop.wait(delay):
+                break
+            delay = min(delay * 2, retry_max_s)
+            continue
+        _state["error"] = None
+        break
+    _finish(start, _state["error"])
+
+
+def _finish(start: float, error: Optional[str]) -> None:
+    _state["error"] = error
+    _state["retrying"] = False
+    _state["warmup_s"] = round(time.perf_counter() - start, 3)
+    _state["ready"] = error is None
+    logger.info("Warm-up finished in %.3fs (ready: %s)", _state["warmup_s"], _state["ready"])
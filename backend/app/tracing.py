@@ -0,0 +1,244 @@
+"""Lightweight OpenTelemetry-style tracing: nested spans exported to a JSONL file or an OTLP/HTTP collector.
+
+TRACING_EXPORTER selects the exporter: "file" (TRACING_FILE, one JSON span per line), "otlp"
+(OTLP/HTTP JSON to OTLP_ENDPOINT, e.g. a local OpenTelemetry Collector or Jaeger on :4318),
+or unset to disable tracing. Disabled spans are a shared no-op object, so call sites stay cheap.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from app.config import OTLP_ENDPOINT, TRACING_EXPORTER, TRACING_FILE, TRACING_SERVICE_NAME
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "events", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]) -> None:
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if _exporter is not None:
+                _exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "events": self.events,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Start a child of the current span (or a new trace), make it current, and end it on exit."""
+    if _exporter is None:
+        yield _NOOP
+        return
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator: run the function inside span(name)."""
+
+    def decorate(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def add_event(name: str, **attributes: Any) -> None:
+    """Attach an event (e.g. a fallback) to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.add_event(name, **attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+# --- Exporters ---
+class FileExporter:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, finished: Span) -> None:
+        line = json.dumps(finished.to_dict(), default=str, separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class OTLPExporter:
+    """Batches spans on a background thread and POSTs them as OTLP/HTTP JSON to {endpoint}/v1/traces."""
+
+    def __init__(self, endpoint: str, service_name: str, batch_size: int = 256, interval_s: float = 2.0) -> None:
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10_000)
+        threading.Thread(target=self._run, name="otlp-exporter", daemon=True).start()
+
+    def export(self, finished: Span) -> None:
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            pass  # drop rather than block the request path
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval_s
+            while len(batch) < self.batch_size and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._post(batch)
+            except Exception as e:
+                logger.warning("OTLP export of %d spans failed: %s", len(batch), e)
+
+    def _post(self, batch: List[Span]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attr("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [_otlp_span(s) for s in batch]}],
+                }
+            ]
+        }
+        req = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=5) as r:
+            r.read()
+
+
+def _otlp_attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns or s.start_ns),
+        "attributes": [_otlp_attr(k, v) for k, v in s.attributes.items()],
+        "events": [
+            {
+                "name": e["name"],
+                "timeUnixNano": str(e["time_ns"]),
+                "attributes": [_otlp_attr(k, v) for k, v in e["attributes"].items()],
+            }
+            for e in s.events
+        ],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+    }
+    if s.parent_id:
+        out["parentSpanId"] = s.parent_id
+    return out
+
+
+def _build_exporter() -> Any:
+    if TRACING_EXPORTER == "file":
+        return FileExporter(Path(TRACING_FILE))
+    if TRACING_EXPORTER == "otlp":
+        return OTLPExporter(OTLP_ENDPOINT, TRACING_SERVICE_NAME)
+    if TRACING_EXPORTER:
+        logger.warning("Unknown TRACING_EXPORTER %r; tracing disabled", TRACING_EXPORTER)
+    return None
+
+
+_exporter = _build_exporter()
@@ -21,6 +21,10 @@ RED_FLAG_PATTERNS: list[tuple[str, str]] = [
     (r"\bwant\s+to\s+die\b", "suicidal thoughts"),
 ]
 
+_COMPILED_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (re.compile(pattern, re.IGNORECASE), label) for pattern, label in RED_FLAG_PATTERNS
+]
+
 
 def get_red_flags(text: str) -> list[str]:
     """Return list of detected red-flag labels (no duplicates, order of first match)."""
@@ -29,13 +33,44 @@ def get_red_flags(text: str) -> list[str]:
     text_lower = text.lower()
     seen: set[str] = set()
     out: list[str] = []
-    for pattern, label in RED_FLAG_PATTERNS:
-        if re.search(pattern, text_lower, re.IGNORECASE) and label not in seen:
+    for pattern, label in _COMPILED_PATTERNS:
+        if label not in seen and pattern.search(text_lower):
             seen.add(label)
             out.append(label)
     return out
 
 
+# Symptom mentions (no red flag needed): used by admission control to queue clinical calls
+# ahead of administrative ones (scheduling, billing, refills).
+SYMPTOM_PATTERNS: list[str] = [
+    r"\bpain(ful)?\b",
+    r"\bhurts?\b",
+    r"\baches?\b|\baching\b",
+    r"\bfever\b",
+    r"\bcough(ing)?\b",
+    r"\bsore\s+throat\b",
+    r"\bheadaches?\b",
+    r"\bdizz(y|iness)\b",
+    r"\bnause(a|ous)\b",
+    r"\bvomit(ing)?\b",
+    r"\bdiarrh(o)?ea\b",
+    r"\brash\b",
+    r"\bswelling\b|\bswollen\b",
+    r"\bbleeding\b",
+    r"\binfection\b",
+    r"\binjur(y|ed)\b",
+    r"\bfeeling\s+(sick|unwell)\b",
+    r"\bsymptoms?\b",
+]
+
+_COMPILED_SYMPTOMS = re.compile("|".join(f"(?:{p})" for p in SYMPTOM_PATTERNS), re.IGNORECASE)
+
+
+def mentions_symptoms(text: str) -> bool:
+    """True when the transcript mentions a symptom (cheap keyword check, not a diagnosis)."""
+    return bool(text) and _COMPILED_SYMPTOMS.search(text) is not None
+
+
 def get_safety_questions(red_flags: list[str]) -> list[str]:
     """Return 1–3 safety questions based on detected red flags."""
     questions: list[str] = []
@@ -0,0 +1,86 @@
+"""
+Hedging benchmark against a fake LLM backend with injected latency spikes (no API key needed).
+
+Run from the backend directory:
+
+    python scripts/bench_hedging.py [--calls 400] [--base-ms 40] [--spike-rate 0.02] [--spike-x 20] [--budget 0.1]
+
+Runs the same call_llm_json workload with and without hedging and prints latency percentiles
+and how many duplicate requests were sent.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import hedging, llm  # noqa: E402
+from app.schemas import INTENT_JSON_SCHEMA  # noqa: E402
+
+ANSWER = json.dumps({"intent": "billing", "confidence": 0.9, "reason": "benchmark"})
+
+
+def spiky_backend(base_s: float, spike_rate: float, spike_x: float, rng: random.Random) -> Callable[..., Any]:
+    def create(**_: Any) -> Any:
+        latency = rng.lognormvariate(0, 0.25) * base_s
+        if rng.random() < spike_rate:
+            latency *= spike_x
+        time.sleep(latency)
+        usage = SimpleNamespace(prompt_tokens=500, completion_tokens=20, prompt_tokens_details=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ANSWER))], usage=usage)
+
+    return create
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(calls: int, hedger: hedging.Hedger) -> list[float]:
+    hedging.hedger = hedger
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        llm.call_llm_json("bench-model", "system", "user", INTENT_JSON_SCHEMA, stage="intent")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--base-ms", type=float, default=40.0, help="median backend latency")
+    parser.add_argument("--spike-rate", type=float, default=0.02, help="fraction of calls that spike")
+    parser.add_argument("--spike-x", type=float, default=20.0, help="latency multiplier for a spike")
+    parser.add_argument("--budget", type=float, default=0.1, help="max duplicate requests per call")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for label, stages in (("no hedging", ()), ("hedging", ("intent",))):
+        llm.set_completion_backend(
+            spiky_backend(args.base_ms / 1000, args.spike_rate, args.spike_x, random.Random(args.seed))
+        )
+        hedger = hedging.Hedger(stages=stages, budget_ratio=args.budget)
+        latencies = run(args.calls, hedger)
+        stats = hedger.stats()
+        print(
+            f"{label:>10}: p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  "
+            f"p90 {percentile(latencies, 0.9) * 1000:7.1f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  "
+            f"mean {statistics.mean(latencies) * 1000:7.1f} ms  "
+            f"hedges {stats['hedges']} (backup wins {stats['hedge_wins']}, budget denied {stats['budget_denied']})"
+        )
+    llm.set_completion_backend(None)
+
+
+if __name__ == "__main__":
+    main()
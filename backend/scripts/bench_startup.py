@@ -0,0 +1,120 @@
+"""
+Cold-start benchmark: import time of app.main, and time from process spawn to
+liveness, readiness and the first successful /analyze.
+
+Run from the backend directory:
+
+    python scripts/bench_startup.py [--runs 5] [--port 8765] [--skip-analyze]
+
+The /analyze step needs OPENAI_API_KEY (env or backend/.env); it is skipped otherwise.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_TRANSCRIPT = (
+    "I need a refill on my blood pressure medication, lisinopril. "
+    "Can you send it to the CVS on Main Street?"
+)
+
+
+def measure_import(runs: int) -> list[float]:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def _request(url: str, body: Optional[dict] = None, timeout: float = 2.0) -> int:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            r.read()
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+def _wait_for(url: str, start: float, deadline_s: float) -> Optional[float]:
+    while time.perf_counter() - start < deadline_s:
+        if _request(url) == 200:
+            return round(time.perf_counter() - start, 3)
+        time.sleep(0.05)
+    return None
+
+
+def measure_server(port: int, analyze: bool, deadline_s: float = 120.0) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        result: dict = {
+            "live_s": _wait_for(f"{base}/health", start, deadline_s),
+            "ready_s": _wait_for(f"{base}/health/ready", start, deadline_s),
+        }
+        if analyze:
+            t = time.perf_counter()
+            status = _request(f"{base}/analyze", {"transcript": SAMPLE_TRANSCRIPT}, timeout=deadline_s)
+            result["first_analyze_status"] = status
+            result["first_analyze_s"] = round(time.perf_counter() - t, 3)
+            result["first_success_s"] = round(time.perf_counter() - start, 3) if status == 200 else None
+        return result
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def _has_api_key() -> bool:
+    if os.environ.get("OPENAI_API_KEY"):
+        return True
+    env_file = BACKEND_DIR / ".env"
+    return env_file.exists() and "OPENAI_API_KEY=sk-" in env_file.read_text()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="import-time samples")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skip-analyze", action="store_true", help="don't send the first /analyze")
+    args = parser.parse_args()
+
+    imports = measure_import(args.runs)
+    print(f"import app.main: median {statistics.median(imports):.3f}s, min {min(imports):.3f}s over {len(imports)} runs")
+
+    analyze = not args.skip_analyze and _has_api_key()
+    if not args.skip_analyze and not analyze:
+        print("OPENAI_API_KEY not set; skipping first /analyze")
+    server = measure_server(args.port, analyze)
+    for key, value in server.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
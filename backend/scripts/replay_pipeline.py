@@ -0,0 +1,77 @@
+"""
+Run the full pipeline against recorded LLM responses (or record them), offline and fast.
+
+Run from the backend directory:
+
+    # Record once against the live API (needs OPENAI_API_KEY)
+    python scripts/replay_pipeline.py --record --cassette cassettes/baseline.jsonl.gz
+
+    # Replay instantly, or with the recorded latency (--latency-scale 1)
+    python scripts/replay_pipeline.py --cassette cassettes/baseline.jsonl.gz --out before.json
+    python scripts/replay_pipeline.py --cassette cassettes/baseline.jsonl.gz --out after.json
+
+Transcripts come from --transcripts (one per line) or a built-in set. The --out file has the
+pipeline outputs without request ids and timings, so two runs can be diffed.
+A prompt or model change makes requests miss the cassette; they show up as errors.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import cassettes  # noqa: E402
+from app.services.pipeline import run_pipeline  # noqa: E402
+
+DEFAULT_TRANSCRIPTS = [
+    "Hi, I need to book an appointment with Dr. Chen. I'm free Thursday afternoon or Friday morning.",
+    "I got a bill for $250 from my last visit and I don't understand what it's for.",
+    "I need a refill on my blood pressure medication, lisinopril. I'm almost out.",
+    "I've had a sore throat and mild fever for two days. No trouble swallowing.",
+    "My father has chest pain and shortness of breath since this morning.",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", default="cassettes/llm.jsonl.gz")
+    parser.add_argument("--record", action="store_true", help="call the live API and record responses")
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="replay latency multiplier (0 = instant)")
+    parser.add_argument("--transcripts", type=Path, help="file with one transcript per line")
+    parser.add_argument("--runs", type=int, default=1, help="passes over the transcripts")
+    parser.add_argument("--out", type=Path, help="write outputs (without ids and timings) for diffing")
+    args = parser.parse_args()
+
+    transcripts = DEFAULT_TRANSCRIPTS
+    if args.transcripts:
+        transcripts = [line.strip() for line in args.transcripts.read_text().splitlines() if line.strip()]
+    cassettes.install("record" if args.record else "replay", args.cassette, args.latency_scale)
+
+    latencies: list[float] = []
+    outputs = []
+    for _ in range(args.runs):
+        for transcript in transcripts:
+            start = time.perf_counter()
+            result = run_pipeline(transcript)
+            latencies.append(time.perf_counter() - start)
+            data = result.model_dump(mode="json", exclude={"request_id", "latency_s", "usage"})
+            outputs.append({"transcript": transcript, **data})
+            if result.errors:
+                print(f"errors for {transcript[:50]!r}: {result.errors}")
+
+    print(
+        f"{len(latencies)} analyses: mean {statistics.mean(latencies) * 1000:.1f} ms, "
+        f"max {max(latencies) * 1000:.1f} ms, total {sum(latencies):.2f} s"
+    )
+    if args.out:
+        args.out.write_text(json.dumps(outputs, indent=2) + "\n")
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Hedged LLM requests against a fake completion backend with injected latency spikes."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+
+from app import hedging, llm
+from app.schemas import INTENT_JSON_SCHEMA, StageUsage
+
+
+def _response(intent: str) -> Any:
+    content = json.dumps({"intent": intent, "confidence": 0.9, "reason": "test"})
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def _backend(latency_s: Callable[[int], float], intent: Callable[[int], str] = lambda _: "billing") -> Any:
+    """Fake chat completions: the n-th request (0-based) sleeps latency_s(n) and answers intent(n)."""
+    lock = threading.Lock()
+    counter = {"n": 0}
+
+    def create(**_: Any) -> Any:
+        with lock:
+            n = counter["n"]
+            counter["n"] += 1
+        time.sleep(latency_s(n))
+        return _response(intent(n))
+
+    return create
+
+
+@pytest.fixture(autouse=True)
+def _reset_backend() -> Iterator[None]:
+    yield
+    llm.set_completion_backend(None)
+
+
+def _use_hedger(monkeypatch: pytest.MonkeyPatch, **kwargs: Any) -> hedging.Hedger:
+    hedger = hedging.Hedger(stages=("intent",), **kwargs)
+    monkeypatch.setattr(hedging, "hedger", hedger)
+    return hedger
+
+
+def _call(usage: Dict[str, StageUsage] | None = None) -> Dict[str, Any]:
+    return llm.call_llm_json("test-model", "system", "user", INTENT_JSON_SCHEMA, stage="intent", usage=usage)
+
+
+def test_spike_past_delay_sends_backup_and_returns_its_result(monkeypatch: pytest.MonkeyPatch) -> None:
+    hedger = _use_hedger(monkeypatch, budget_ratio=1.0, min_samples=5)
+    # Requests 0-4 warm up the delay at ~10 ms; request 5 (the primary) spikes, request 6 is the backup.
+    llm.set_completion_backend(
+        _backend(
+            latency_s=lambda n: 1.0 if n == 5 else 0.01,
+            intent=lambda n: "refill" if n == 6 else "billing",
+        )
+    )
+    for _ in range(5):
+        _call()
+
+    usage: Dict[str, StageUsage] = {}
+    start = time.perf_counter()
+    result = _call(usage)
+    elapsed = time.perf_counter() - start
+
+    assert result["intent"] == "refill"
+    assert elapsed < 0.5
+    assert usage["intent"].attempts[0].hedged
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_no_hedging_before_min_samples(monkeypatch: pytest.MonkeyPatch) -> None:
+    hedger = _use_hedger(monkeypatch, budget_ratio=1.0, min_samples=20)
+    llm.set_completion_backend(_backend(latency_s=lambda n: 0.05 if n % 2 else 0.001))
+
+    for _ in range(10):
+        _call()
+
+    assert hedger.delay_for("intent") is None
+    assert hedger.stats()["hedges"] == 0
+
+
+def test_budget_ratio_caps_duplicates(monkeypatch: pytest.MonkeyPatch) -> None:
+    hedger = _use_hedger(monkeypatch, budget_ratio=0.1, min_samples=5)
+    # A full window of 1 ms samples keeps the delay at ~1 ms, so every 20 ms call wants a hedge.
+    for _ in range(200):
+        hedger._observe("intent", 0.001)
+    llm.set_completion_backend(_backend(latency_s=lambda _: 0.02))
+
+    for _ in range(10):
+        _call()
+
+    stats = hedger.stats()
+    assert stats["calls"] == 10
+    assert stats["hedges"] == 1  # 10 calls x 0.1
+    assert stats["budget_denied"] == 9
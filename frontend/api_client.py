@@ -0,0 +1,67 @@
+"""Backend client for the Streamlit app: pooled session, cached health check, streaming analysis."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# How long a successful health check is reused across reruns.
+HEALTH_TTL_S = 30
+# (connect, read) timeouts. The read timeout applies between streamed events, not to the whole analysis.
+HEALTH_TIMEOUT = (3, 5)
+ANALYZE_TIMEOUT = (5, 120)
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive session per Streamlit server process, shared by all reruns and sessions."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),  # never replay an analysis POST
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=HEALTH_TTL_S, show_spinner=False)
+def _fetch_health(backend_url: str) -> bool:
+    r = get_session().get(f"{backend_url}/health", timeout=HEALTH_TIMEOUT)
+    r.raise_for_status()
+    return True
+
+
+def check_health(backend_url: str) -> bool:
+    # Failures raise inside _fetch_health, so they are not cached and the next rerun tries again.
+    try:
+        return _fetch_health(backend_url)
+    except Exception:
+        return False
+
+
+def stream_analysis(backend_url: str, payload: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    POST to /analyze/stream and yield (stage, data) as each agent finishes.
+    Stages: intent, triage, orchestration, documentation, then result (full response).
+    """
+    with get_session().post(
+        f"{backend_url}/analyze/stream",
+        json=payload,
+        stream=True,
+        timeout=ANALYZE_TIMEOUT,
+    ) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            yield event["stage"], event["data"]
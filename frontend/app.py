@@ -1,4 +1,4 @@
-"""Streamlit frontend for Care Navigator Agent. Calls backend for /health and /analyze."""
+"""Streamlit frontend for Care Navigator Agent. Calls backend for /health and /analyze/stream."""
 import os
 from pathlib import Path
 
@@ -7,6 +7,7 @@ import streamlit as st
 
 from dotenv import load_dotenv
 
+from api_client import check_health, stream_analysis
 from samples import SAMPLES, get_sample_by_id
 from ui_components import (
     render_intent,
@@ -25,20 +26,12 @@ load_dotenv(_env_path)
 BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8000")
 
 
-def check_health() -> bool:
-    try:
-        r = requests.get(f"{BACKEND_URL}/health", timeout=5)
-        return r.status_code == 200
-    except Exception:
-        return False
-
-
 st.set_page_config(page_title="Care Navigator Agent", layout="wide")
 st.title("Care Navigator Agent")
 st.caption("Healthcare Call Center Agent Assist — paste a call transcript and run the pipeline.")
 
-# Health check on startup
-if not check_health():
+# Health check (cached with a TTL, so widget reruns don't hit the backend)
+if not check_health(BACKEND_URL):
     st.error(
         "Backend is unreachable. Make sure the FastAPI server is running at "
         f"**{BACKEND_URL}** (e.g. `uvicorn app.main:app --reload --port 8000` from the backend directory)."
@@ -75,30 +68,46 @@ with col_right:
         if not transcript.strip():
             st.warning("Please enter a transcript.")
         else:
+            # Placeholders in display order; each section fills in as its agent finishes.
+            intent_slot = st.empty()
+            triage_slot = st.empty()
+            orchestration_slot = st.empty()
+            documentation_slot = st.empty()
+            metadata_slot = st.empty()
+            data = {}
             with st.spinner("Running pipeline..."):
                 try:
-                    r = requests.post(
-                        f"{BACKEND_URL}/analyze",
-                        json={
+                    for stage, payload in stream_analysis(
+                        BACKEND_URL,
+                        {
                             "transcript": transcript,
                             "caller_context": None,
                             "channel": None,
                             "debug": debug,
                         },
-                        timeout=120,
-                    )
-                    r.raise_for_status()
-                    data = r.json()
+                    ):
+                        if stage == "result":
+                            data = payload
+                            with metadata_slot.container():
+                                render_metadata(data)
+                            continue
+                        data[stage] = payload
+                        if stage == "intent":
+                            with intent_slot.container():
+                                render_intent(data)
+                        elif stage == "triage":
+                            with triage_slot.container():
+                                render_triage(data)
+                        elif stage == "orchestration":
+                            with orchestration_slot.container():
+                                render_routing(data)
+                                render_next_best_actions(data)
+                                render_suggested_script(data)
+                        elif stage == "documentation":
+                            with documentation_slot.container():
+                                render_documentation(data)
                 except requests.exceptions.RequestException as e:
                     st.error(f"Request failed: {e}. Is the backend running at {BACKEND_URL}?")
                     st.stop()
-            # Render sections in order
-            render_intent(data)
-            render_triage(data)
-            render_routing(data)
-            render_next_best_actions(data)
-            render_suggested_script(data)
-            render_documentation(data)
-            render_metadata(data)
     else:
         st.info("Click **Analyze** to run the pipeline on the transcript.")
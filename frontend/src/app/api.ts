@@ -40,6 +40,18 @@ export interface DocumentationResult {
   follow_up_tasks: string[];
 }
 
+export interface StageUsage {
+  calls: number;
+  prompt_tokens: number;
+  cached_tokens: number;
+  completion_tokens: number;
+}
+
+export interface DebugInfo {
+  trace_id?: string | null;
+  profile?: { format: "collapsed"; interval_ms: number; duration_s: number; samples: number; collapsed: string } | null;
+}
+
 export interface AnalyzeResponse {
   request_id: string;
   intent: IntentResult;
@@ -50,6 +62,8 @@ export interface AnalyzeResponse {
   model_used: string;
   warnings: string[];
   errors: string[];
+  usage?: Record<string, StageUsage>;
+  debug?: DebugInfo | null;
 }
 
 export async function checkHealth(): Promise<boolean> {
@@ -61,7 +75,7 @@ export async function checkHealth(): Promise<boolean> {
   }
 }
 
-export async function transcribeAudio(file: File): Promise<{ transcript: string }> {
+export async function transcribeAudio(file: File): Promise<{ transcript: string; cached?: boolean }> {
   const formData = new FormData();
   formData.append('file', file);
   